@@ -0,0 +1,92 @@
+### Version History
+### - v0: Oct 19, 2026
+
+import numpy as np
+
+# Instead of sampling error patterns, we can visit every one of the 2^d error patterns of a
+# distance-d repetition code exactly once, and count how many patterns of each weight w make
+# MWPMDecoder1D fail. Call that count A_w. Since every pattern of weight w occurs with
+# probability p^w (1-p)^(d-w), the logical error probability is then exactly
+#
+#     P_L(p) = sum_w A_w p^w (1-p)^(d-w)
+#
+# for every p at once, with no sampling noise.
+#
+# The patterns are visited in Gray-code order, where each pattern differs from the previous one
+# by a single flipped qubit. That way the decoder's candidate correction can be updated from the
+# previous pattern instead of decoding the syndrome from scratch.
+
+def get_gray_code_flips(start, stop):
+    # the qubit flipped when going from Gray code pattern i-1 to pattern i, for i in [start, stop)
+    # it is the position of the lowest set bit of i
+    i = np.arange(start, stop, dtype=np.int64)
+    return np.bitwise_count((i & -i) - 1).astype(np.int64)
+
+def get_failure_weight_spectrum(n_qubits, chunk_size=2**20):
+    """
+    Exact number of error patterns of each weight that MWPMDecoder1D fails to correct
+    on a distance-`n_qubits` repetition code.
+    Returns an array A of length n_qubits + 1 where A[w] counts the failing weight-w patterns.
+    """
+    if not 1 <= n_qubits <= 62:
+        raise ValueError(f"n_qubits must be between 1 and 62, got {n_qubits}")
+    d = n_qubits
+    all_qubits = (1 << d) - 1
+
+    # bitmasks that change when qubit q is flipped:
+    # - the error pattern itself: bit q
+    # - the decoder candidate that assumes no error on qubit 0 (count_from_left(start_with_error=False)):
+    #   qubit k of that candidate is the XOR of parities 0..k-1. Flipping qubit q flips parities
+    #   q-1 and q, so for q > 0 only qubit q of the candidate changes, while flipping qubit 0
+    #   (parity 0 only) changes qubits 1..d-1.
+    # The candidate depends on the syndrome alone (the XOR of its neighbouring qubits is the
+    # syndrome), so tracking it is the same as tracking the syndrome, one step closer to the decision.
+    qubits = np.arange(d, dtype=np.int64)
+    error_flips = np.left_shift(1, qubits)
+    candidate_flips = error_flips.copy()
+    candidate_flips[0] = all_qubits ^ 1
+
+    failure_weights = np.zeros(d + 1, dtype=np.int64)
+
+    # the first pattern, no errors at all, is always decoded correctly
+    error, candidate = 0, 0
+    for start in range(1, 1 << d, chunk_size):
+        stop = min(start + chunk_size, 1 << d)
+        flips = get_gray_code_flips(start, stop)
+
+        # walk through the chunk one flipped qubit at a time, starting from the last pattern of the previous chunk
+        errors = np.bitwise_xor.accumulate(error_flips[flips]) ^ error
+        candidates = np.bitwise_xor.accumulate(candidate_flips[flips]) ^ candidate
+        error, candidate = int(errors[-1]), int(candidates[-1])
+
+        # like MWPMDecoder1D.decode: keep the candidate unless its complement has fewer errors
+        candidate_weights = np.bitwise_count(candidates)
+        decoded = np.where(2 * candidate_weights <= d, candidates, candidates ^ all_qubits)
+
+        # a logical error happens when the decoded error locations differ from the actual ones
+        is_logical_error = decoded != errors
+        failure_weights += np.bincount(np.bitwise_count(errors[is_logical_error]), minlength=d + 1)
+
+    return failure_weights
+
+def get_logical_error_probability_function(failure_weights):
+    # turns the failure weight spectrum A_w of a distance-d code into P_L(p) = sum_w A_w p^w (1-p)^(d-w)
+    # the returned function accepts a single p or an array of them
+    failure_weights = np.asarray(failure_weights, dtype=float)
+    d = len(failure_weights) - 1
+    weights = np.arange(d + 1)
+
+    def logical_error_probability(p):
+        p = np.asarray(p, dtype=float)[..., np.newaxis]
+        return np.sum(failure_weights * p**weights * (1-p)**(d-weights), axis=-1)
+
+    return logical_error_probability
+
+def get_logical_error_probability_exact(distances, physical_errors):
+    # same output format as get_logical_error_probability_analytical, to be plotted with
+    # plot_logical_error_probabilities alongside the simulated curves
+    all_exact_errors = []
+    for distance in distances:
+        logical_error_probability = get_logical_error_probability_function(get_failure_weight_spectrum(distance))
+        all_exact_errors.append(logical_error_probability(physical_errors))
+    return all_exact_errors
@@ -0,0 +1,236 @@
+### Version History
+### - v0: Oct 19, 2026
+### - v1: Oct 19, 2026, repeated measurement keys
+### - v2: Oct 19, 2026, reference sample from stim
+
+import numpy as np
+import cirq
+import stimcirq
+
+# A Pauli frame simulator runs a Clifford circuit once without noise to get a reference sample,
+# and then only tracks, for every shot, which Pauli errors (the "frame") sit on top of that
+# noiseless run. Clifford gates map Paulis to Paulis, so the frame of each qubit is just two bits:
+# an X bit (flips Z-basis measurements) and a Z bit. A measurement outcome is the reference outcome
+# XOR the X bit of the frame.
+#
+# The frames of all shots are stored bit-packed, 64 shots per uint64 word, with one row per qubit.
+# Each gate is then a handful of XORs or swaps of whole rows, applied to all shots at once,
+# instead of one state-vector simulation per shot.
+#
+# Supported operations: H, S, CNOT, CZ, SWAP, Paulis (X, Y, Z, I), Z-basis measurements and resets,
+# plus the noise channels cirq.bit_flip, cirq.phase_flip, cirq.depolarize (single qubit) and
+# Pauli.with_probability.
+
+def is_noise_operation(op):
+    return isinstance(op.gate, (cirq.BitFlipChannel, cirq.PhaseFlipChannel,
+                                cirq.DepolarizingChannel, cirq.RandomGateChannel))
+
+def remove_noise(circuit):
+    # the same circuit without its noise channels, used to take the reference sample
+    return cirq.Circuit(cirq.Moment(op for op in moment if not is_noise_operation(op)) for moment in circuit)
+
+def insert_noise(circuit, noise):
+    # noise: {moment_index: list of noise operations}, inserted as new moments just before the
+    # moment that has that index in the original circuit (len(circuit) appends them at the end)
+    moments = []
+    for moment_index in range(len(circuit) + 1):
+        if moment_index in noise:
+            # operations on the same qubit end up in consecutive moments
+            moments += cirq.Circuit(noise[moment_index]).moments
+        if moment_index < len(circuit):
+            moments.append(circuit[moment_index])
+    return cirq.Circuit(moments)
+
+class PauliFrameSimulator:
+    """
+    Samples a Clifford cirq circuit for many shots at once by propagating Pauli frames.
+    `noise` optionally maps moment indices to lists of noise operations to insert just before
+    those moments, eg {3: cirq.bit_flip(0.01).on_each(*data_qubits)}. Noise channels that are
+    already part of the circuit are simulated as well.
+    Construction converts the circuit for stim and compiles it once, which grows with the circuit
+    size rather than the shot count: about 3 s for a d=15 surface code with 15 rounds (841 qubits).
+    """
+
+    def __init__(self, circuit, noise=None):
+        if noise:
+            circuit = insert_noise(circuit, noise)
+        self.circuit = circuit
+        self.qubits = sorted(circuit.all_qubits())
+        self.num_qubits = len(self.qubits)
+        self.qubit_index = {qubit: index for index, qubit in enumerate(self.qubits)}
+        self.measurement_keys = {}  # measurement key -> rows of the measurement record, one list per time the key is measured
+        self.num_measurements = 0
+        self.instructions = self._compile(circuit)
+
+        # one noiseless run gives the reference measurement outcomes, frames give the differences
+        # stim takes it in well under a second even for hundreds of qubits, where cirq.CliffordSimulator
+        # takes tens of seconds; its measurements come in circuit order, the same as the record rows
+        self.reference_record = stimcirq.cirq_circuit_to_stim_circuit(remove_noise(circuit)).reference_sample()
+        if len(self.reference_record) != self.num_measurements:
+            raise ValueError(f"Expected {self.num_measurements} reference measurements, got {len(self.reference_record)}")
+        # the reference outcomes per measurement key, laid out like one shot of sample()
+        self.reference_sample = {}
+        for key, rows in self.measurement_keys.items():
+            outcomes = self.reference_record[rows[0] if len(rows) == 1 else rows]
+            self.reference_sample[key] = outcomes.astype(np.uint8)
+
+    def _compile(self, circuit):
+        # turns every moment into a list of (instruction, targets, parameter) tuples, merging
+        # operations of the same kind so each instruction acts on all of its qubits at once
+        # targets is an array of qubit indices, with one row per operand for two-qubit gates
+        # (and qubit indices plus measurement record rows for measurements)
+        instructions = []
+        for moment in circuit:
+            grouped = {}
+            for op in moment:
+                instruction, targets, parameter = self._compile_operation(op)
+                if instruction is None:
+                    continue
+                grouped.setdefault((instruction, parameter), []).extend(targets)
+            for (instruction, parameter), targets in grouped.items():
+                instructions.append((instruction, np.array(targets, dtype=np.int64).T, parameter))
+        return instructions
+
+    def _compile_operation(self, op):
+        gate = op.gate
+        targets = [self.qubit_index[qubit] for qubit in op.qubits]
+
+        if gate in (cirq.X, cirq.Y, cirq.Z, cirq.I) or isinstance(gate, cirq.IdentityGate):
+            # Paulis only change signs, which the reference sample already accounts for
+            return None, None, None
+        if gate == cirq.H:
+            return 'H', targets, None
+        if gate in (cirq.S, cirq.S**-1):
+            return 'S', targets, None
+        if gate == cirq.CNOT:
+            return 'CNOT', [tuple(targets)], None
+        if gate == cirq.CZ:
+            return 'CZ', [tuple(targets)], None
+        if gate == cirq.SWAP:
+            return 'SWAP', [tuple(targets)], None
+        if isinstance(gate, cirq.ResetChannel):
+            return 'R', targets, None
+        if isinstance(gate, cirq.MeasurementGate):
+            # a key can be measured more than once, eg in circuits that repeat a syndrome extraction round
+            key = cirq.measurement_key_name(op)
+            rows = list(range(self.num_measurements, self.num_measurements + len(targets)))
+            self.measurement_keys.setdefault(key, []).append(rows)
+            self.num_measurements += len(targets)
+            return 'M', list(zip(targets, rows)), None
+        if isinstance(gate, cirq.BitFlipChannel):
+            return 'X_ERROR', targets, gate.p
+        if isinstance(gate, cirq.PhaseFlipChannel):
+            return 'Z_ERROR', targets, gate.p
+        if isinstance(gate, cirq.DepolarizingChannel) and gate.num_qubits() == 1:
+            return 'DEPOLARIZE1', targets, gate.p
+        if isinstance(gate, cirq.RandomGateChannel) and gate.sub_gate in (cirq.X, cirq.Y, cirq.Z):
+            return f'{gate.sub_gate}_ERROR', targets, gate.probability
+        raise ValueError(f"Operation {op} is not supported by the Pauli frame simulator")
+
+    def sample(self, n_shots, seed=None, batch_size=2**16):
+        # returns {measurement key: (n_shots, n_qubits measured) array}, the same layout
+        # as result.measurements from cirq.Simulator().run(circuit, repetitions=n_shots)
+        # keys measured more than once get a (n_shots, n_times measured, n_qubits measured) array
+        # instead, the same layout as result.records
+        rng = np.random.default_rng(seed)
+        records = np.zeros((self.num_measurements, n_shots), dtype=np.uint8)
+        for start in range(0, n_shots, batch_size):
+            shots = min(batch_size, n_shots - start)
+            records[:, start:start + shots] = np.unpackbits(self.sample_packed(shots, rng).view(np.uint8), axis=1,
+                                                            count=shots, bitorder='little')
+        samples = {}
+        for key, rows in self.measurement_keys.items():
+            if len(rows) == 1:
+                samples[key] = records[rows[0]].T
+            else:
+                samples[key] = records[rows].transpose(2, 0, 1)
+        return samples
+
+    def sample_packed(self, n_shots, seed=None):
+        # all measurement outcomes as a (num_measurements, ceil(n_shots / 64)) uint64 array, with
+        # shot k in bit k % 64 of word k // 64 and rows as in self.measurement_keys
+        # (in the order the measurements happen in the circuit)
+        # bits past the last shot are meaningless; for large circuits and many shots this keeps
+        # the outcomes 8 times smaller than sample() and ready for bitwise post-processing
+        rng = np.random.default_rng(seed)
+        records = self._run_batch(n_shots, rng)
+        # flip the rows whose reference outcome is 1
+        records[self.reference_record] = ~records[self.reference_record]
+        return records
+
+    def _random_bits(self, rng, n_rows, n_words):
+        # (n_rows, n_words) packed words of uniformly random bits
+        return rng.integers(0, 256, size=(n_rows, 8 * n_words), dtype=np.uint8).view(np.uint64)
+
+    def _random_positions(self, rng, n_bits, p):
+        # sorted positions in [0, n_bits) that are each picked independently with probability p
+        if p <= 0:
+            return np.zeros(0, dtype=np.int64)
+        if p < 0.1:
+            # jump from one position to the next with geometric gaps, without drawing a
+            # random number for every bit
+            expected = n_bits * p
+            n_draws = int(expected + 6 * np.sqrt(expected) + 10)
+            positions = np.cumsum(rng.geometric(p, size=n_draws)) - 1
+            while positions[-1] < n_bits:
+                positions = np.concatenate([positions, positions[-1] + np.cumsum(rng.geometric(p, size=n_draws))])
+            return positions[positions < n_bits]
+        # otherwise draw the bits densely, a bounded number at a time
+        chunk = 2**24
+        return np.concatenate([start + np.flatnonzero(rng.random(min(chunk, n_bits - start)) < p)
+                               for start in range(0, n_bits, chunk)])
+
+    def _positions_to_bits(self, positions, n_rows, n_words):
+        # packed (n_rows, n_words) words with the bits at the given flat positions set
+        words = np.zeros(n_rows * n_words, dtype=np.uint64)
+        np.bitwise_or.at(words, positions >> 6, np.left_shift(np.uint64(1), (positions & 63).astype(np.uint64)))
+        return words.reshape(n_rows, n_words)
+
+    def _run_batch(self, n_shots, rng):
+        n_words = (n_shots + 63) // 64
+        x = np.zeros((self.num_qubits, n_words), dtype=np.uint64)
+        # all qubits start in |0>, where a Z is invisible, so the Z frame can start out random
+        # this is what lets measurements with random outcomes come out random
+        z = self._random_bits(rng, self.num_qubits, n_words)
+        records = np.zeros((self.num_measurements, n_words), dtype=np.uint64)
+
+        for instruction, targets, parameter in self.instructions:
+            if instruction == 'H':
+                x[targets], z[targets] = z[targets], x[targets]
+            elif instruction == 'S':
+                z[targets] ^= x[targets]
+            elif instruction == 'CNOT':
+                control, target = targets
+                x[target] ^= x[control]
+                z[control] ^= z[target]
+            elif instruction == 'CZ':
+                a, b = targets
+                z[a] ^= x[b]
+                z[b] ^= x[a]
+            elif instruction == 'SWAP':
+                a, b = targets
+                x[a], x[b] = x[b], x[a]
+                z[a], z[b] = z[b], z[a]
+            elif instruction == 'M':
+                measured, rows = targets
+                records[rows] = x[measured]
+                # after a Z-basis measurement the qubit is in a Z eigenstate again
+                z[measured] = self._random_bits(rng, len(measured), n_words)
+            elif instruction == 'R':
+                x[targets] = 0
+                z[targets] = self._random_bits(rng, len(targets), n_words)
+            elif instruction in ('X_ERROR', 'Y_ERROR', 'Z_ERROR'):
+                positions = self._random_positions(rng, len(targets) * 64 * n_words, parameter)
+                flips = self._positions_to_bits(positions, len(targets), n_words)
+                if instruction != 'Z_ERROR':
+                    x[targets] ^= flips
+                if instruction != 'X_ERROR':
+                    z[targets] ^= flips
+            elif instruction == 'DEPOLARIZE1':
+                # with probability p apply one of X, Y, Z, each with probability 1/3
+                positions = self._random_positions(rng, len(targets) * 64 * n_words, parameter)
+                pauli = rng.integers(1, 4, size=len(positions))  # 1 = X, 2 = Z, 3 = Y
+                x[targets] ^= self._positions_to_bits(positions[pauli & 1 == 1], len(targets), n_words)
+                z[targets] ^= self._positions_to_bits(positions[pauli & 2 == 2], len(targets), n_words)
+
+        return records
@@ -0,0 +1,327 @@
+### Version History
+### - v0: Oct 19, 2026
+
+from math import comb
+import numpy as np
+import stim
+
+# A level-L concatenated code is a tree: every node at level l is a block of `block_size`
+# nodes from level l-1, and the leaves (level 0) are physical qubits.
+# Each level is either
+#   - 'bit':   a bit-flip repetition code, |0> -> |000>, |1> -> |111>
+#   - 'phase': a phase-flip repetition code, |0> -> |+++>, |1> -> |--->
+# Shor's 9-qubit code is ['bit', 'phase'] (bit-flip blocks inside a phase-flip code).
+#
+# Every logical operator of such a code can be written as a product of the *same*
+# single-qubit Pauli on all qubits of a block: a phase-flip level swaps the roles of X and Z.
+# So for a fixed noise type (only X or only Z errors, as in the chapter 3 Shor circuit)
+# every level either
+#   - has checks that detect the noise (majority vote, or 1D MWPM, over its children), or
+#   - has checks that commute with the noise, so the children's logical errors simply add up (XOR).
+
+def get_concatenated_code_levels(n_levels, code='shor'):
+    # levels are listed from the innermost (closest to the physical qubits) to the outermost
+    # an explicit list such as ['bit', 'bit', 'phase'] is passed through as is
+    if not isinstance(code, str):
+        return list(code)
+    if code == 'shor':
+        return ['bit' if level % 2 == 0 else 'phase' for level in range(n_levels)]
+    if code == 'repetition':
+        return ['bit'] * n_levels
+    raise ValueError(f"Unknown concatenated code '{code}', expected 'shor' or 'repetition'")
+
+def get_check_types(levels):
+    # Pauli type of the checks at each level, and of the all-Z/all-X logicals of the whole code
+    # at level 0 a single qubit has logical Z = Z and logical X = X
+    logical_z, logical_x = 'Z', 'X'
+    check_types = []
+    for level in levels:
+        if level == 'bit':
+            # checks compare logical Z of neighbouring children, logical Z/X keep their type
+            check_types.append(logical_z)
+        elif level == 'phase':
+            # checks compare logical X of neighbouring children, logical Z/X swap type
+            check_types.append(logical_x)
+            logical_z, logical_x = logical_x, logical_z
+        else:
+            raise ValueError(f"Unknown level type '{level}', expected 'bit' or 'phase'")
+    return check_types, logical_z, logical_x
+
+def get_detecting_levels(levels, error_gate='X'):
+    # X errors are detected by Z-type checks, Z errors by X-type checks
+    check_types, _, _ = get_check_types(levels)
+    detected_by = 'Z' if error_gate == 'X' else 'X'
+    return [check_type == detected_by for check_type in check_types]
+
+def build_concatenated_code_circuit_stim(n_levels, p, error_gate='X', code='shor', block_size=3):
+    """
+    Code-capacity circuit for a level-`n_levels` concatenated code, in the style of
+    `build_shor_code_circuit_stim`: encode, apply X_ERROR or Z_ERROR to every data qubit,
+    then measure the checks that detect this noise and the logical observable it flips.
+
+    Detectors are declared level by level (innermost first), block by block, and
+    neighbouring-children pair by pair, which is the layout `HierarchicalDecoder` expects.
+    """
+    if block_size % 2 == 0:
+        raise ValueError(f"block_size must be odd, got {block_size}")
+    levels = get_concatenated_code_levels(n_levels, code)
+    check_types, logical_z, logical_x = get_check_types(levels)
+    detecting = get_detecting_levels(levels, error_gate)
+    n_qubits = block_size ** len(levels)
+    qubits = " ".join(str(q) for q in range(n_qubits))
+
+    # the observable is the all-Z (for X noise) or all-X (for Z noise) logical operator
+    # prepare its +1 eigenstate: |0>_L if it is the logical Z, |+>_L if it is the logical X
+    observable_type = 'Z' if error_gate == 'X' else 'X'
+    lines = [f"R {qubits}"]
+    if observable_type == logical_x:
+        lines.append("H 0")
+
+    # encoder: starting from the outermost level, spread the state of the first qubit of each
+    # block onto the first qubit of each of its children
+    for level_index in reversed(range(len(levels))):
+        child_size = block_size ** level_index
+        block_stride = child_size * block_size
+        targets = []
+        heads = []
+        for block_start in range(0, n_qubits, block_stride):
+            for child in range(1, block_size):
+                targets += [block_start, block_start + child * child_size]
+            heads += [block_start + child * child_size for child in range(block_size)]
+        lines.append("CNOT " + " ".join(str(q) for q in targets))
+        if levels[level_index] == 'phase':
+            lines.append("H " + " ".join(str(q) for q in heads))
+
+    # insert error gates
+    lines.append(f"{error_gate}_ERROR({p}) {qubits}")
+
+    # checks between neighbouring children of every block, only at the levels that see this noise
+    for level_index, (check_type, is_detecting) in enumerate(zip(check_types, detecting)):
+        if not is_detecting:
+            continue
+        child_size = block_size ** level_index
+        for block_start in range(0, n_qubits, child_size * block_size):
+            for child in range(block_size - 1):
+                first = block_start + child * child_size
+                support = range(first, first + 2 * child_size)
+                lines.append("MPP " + "*".join(f"{check_type}{q}" for q in support))
+                lines.append("DETECTOR rec[-1]")
+
+    lines.append("MPP " + "*".join(f"{observable_type}{q}" for q in range(n_qubits)))
+    lines.append("OBSERVABLE_INCLUDE(0) rec[-1]")
+
+    return stim.Circuit("\n".join(lines))
+
+def get_concatenated_code_parity_check_matrix(n_levels, error_gate='X', code='shor', block_size=3):
+    # parity-check matrix H (n_detectors x n_qubits) and observable row for the same noise,
+    # rows in the same order as the detectors of build_concatenated_code_circuit_stim
+    levels = get_concatenated_code_levels(n_levels, code)
+    detecting = get_detecting_levels(levels, error_gate)
+    n_qubits = block_size ** len(levels)
+
+    rows = []
+    for level_index, is_detecting in enumerate(detecting):
+        if not is_detecting:
+            continue
+        child_size = block_size ** level_index
+        for block_start in range(0, n_qubits, child_size * block_size):
+            for child in range(block_size - 1):
+                row = np.zeros(n_qubits, dtype=np.uint8)
+                first = block_start + child * child_size
+                row[first:first + 2 * child_size] = 1
+                rows.append(row)
+
+    parity_check_matrix = np.array(rows, dtype=np.uint8).reshape(len(rows), n_qubits)
+    observable = np.ones(n_qubits, dtype=np.uint8)
+    return parity_check_matrix, observable
+
+# The simulation below works on bit-packed shots: an array of shape (n_rows, n_words) of uint8,
+# where bit j of word k in a row is the value of that row (qubit, detector, ...) in shot 8*k + j.
+# Folding a block of children or taking a majority vote is then a few bitwise operations on
+# whole rows, handling 8 shots per byte.
+
+def pack_shots(bits):
+    # (n_shots, n_rows) booleans -> (n_rows, n_words) packed shots
+    return np.ascontiguousarray(np.packbits(np.asarray(bits, dtype=bool), axis=0, bitorder='little').T)
+
+def unpack_shots(packed, n_shots):
+    # inverse of pack_shots, also accepts a single packed row of shape (n_words,)
+    return np.unpackbits(packed, axis=-1, count=n_shots, bitorder='little').T.astype(bool)
+
+def get_block_parities(packed, block_size):
+    # parity of every block of block_size consecutive rows
+    children = packed.reshape(-1, block_size, packed.shape[-1])
+    parities = children[:, 0].copy()
+    for child in range(1, block_size):
+        parities ^= children[:, child]
+    return parities
+
+def get_concatenated_code_syndromes_packed(packed_errors, levels, error_gate='X', block_size=3):
+    # packed_errors: (n_qubits, n_words) packed X (or Z) error locations
+    # returns the packed detection events (n_detectors, n_words) and observable flips (n_words,)
+    # computed by folding the blocks level by level instead of a dense matrix product
+    parities = packed_errors # parity of all errors inside each node of the current level
+    syndromes = []
+    for is_detecting in get_detecting_levels(levels, error_gate):
+        if is_detecting:
+            children = parities.reshape(-1, block_size, parities.shape[-1])
+            syndromes.append((children[:, :-1] ^ children[:, 1:]).reshape(-1, parities.shape[-1]))
+        parities = get_block_parities(parities, block_size)
+
+    syndromes = np.concatenate(syndromes) if syndromes else np.zeros((0, parities.shape[-1]), dtype=np.uint8)
+    return syndromes, parities[0]
+
+def get_concatenated_code_syndromes(errors, levels, error_gate='X', block_size=3):
+    # errors: (n_shots, n_qubits) boolean array of X (or Z) error locations
+    # same result as (errors @ H.T) % 2 and (errors @ observable) % 2 with H and observable
+    # from get_concatenated_code_parity_check_matrix
+    n_shots = len(errors)
+    syndromes, observable_flips = get_concatenated_code_syndromes_packed(pack_shots(errors), levels,
+                                                                         error_gate, block_size)
+    return unpack_shots(syndromes, n_shots), unpack_shots(observable_flips, n_shots)
+
+class HierarchicalDecoder:
+    """
+    Decodes a concatenated code one level at a time, for all shots at once.
+    At levels whose checks detect the noise, each block picks the lighter of the two
+    assignments consistent with its checks (majority vote for block_size = 3, the same
+    rule as MWPMDecoder1D for longer blocks). At the other levels corrections just add up.
+    """
+
+    def __init__(self, levels, error_gate='X', block_size=3):
+        if block_size % 2 == 0:
+            raise ValueError(f"block_size must be odd, got {block_size}")
+        self.levels = list(levels)
+        self.error_gate = error_gate
+        self.block_size = block_size
+        self.num_qubits = block_size ** len(self.levels)
+        self.detecting = get_detecting_levels(self.levels, error_gate)
+        self.num_detectors = sum((block_size - 1) * block_size ** (len(self.levels) - 1 - level_index)
+                                 for level_index, is_detecting in enumerate(self.detecting)
+                                 if is_detecting)
+
+    def decode_batch(self, syndromes):
+        # syndromes: (n_shots, num_detectors), eg the detection events sampled from stim
+        # returns the predicted flip of the logical observable for every shot
+        syndromes = np.asarray(syndromes, dtype=bool)
+        if syndromes.ndim != 2 or syndromes.shape[1] != self.num_detectors:
+            raise ValueError(f"Expected syndromes of shape (n_shots, {self.num_detectors}), got {syndromes.shape}")
+        return unpack_shots(self.decode_packed(pack_shots(syndromes)), len(syndromes))
+
+    def decode_packed(self, packed_syndromes):
+        # packed_syndromes: (num_detectors, n_words) packed shots, see pack_shots
+        # returns the packed predicted observable flips, shape (n_words,)
+        if packed_syndromes.shape[0] != self.num_detectors:
+            raise ValueError(f"Expected {self.num_detectors} detectors, got {packed_syndromes.shape[0]}")
+        n_words = packed_syndromes.shape[1]
+        b = self.block_size
+
+        # parity of all corrections applied so far inside each node of the current level
+        # at level 0 nothing has been corrected yet
+        corrections = np.zeros((self.num_qubits, n_words), dtype=np.uint8)
+        offset = 0
+        for is_detecting in self.detecting:
+            if is_detecting:
+                children = corrections.reshape(-1, b, n_words)
+                n_blocks = children.shape[0]
+                checks = packed_syndromes[offset:offset + n_blocks * (b - 1)].reshape(n_blocks, b - 1, n_words)
+                offset += n_blocks * (b - 1)
+
+                # remove the effect of the corrections already applied to the children,
+                # leaving checks on the residual logical errors of the children
+                checks = checks ^ children[:, :-1] ^ children[:, 1:]
+
+                # like MWPMDecoder1D.count_from_left: assume no error on the first child and
+                # propagate through the chain ...
+                residual = np.zeros((n_blocks, b, n_words), dtype=np.uint8)
+                for child in range(1, b):
+                    residual[:, child] = residual[:, child - 1] ^ checks[:, child - 1]
+
+                # ... then keep the complement if more than half of the children are flipped
+                # at_least[k] marks the shots where at least k + 1 children are flipped so far
+                at_least = np.zeros((b // 2 + 1, n_blocks, n_words), dtype=np.uint8)
+                for child in range(1, b):
+                    for k in range(b // 2, 0, -1):
+                        at_least[k] |= at_least[k - 1] & residual[:, child]
+                    at_least[0] |= residual[:, child]
+                residual ^= at_least[b // 2][:, np.newaxis]
+
+                # flipping a child applies its (odd weight) logical operator
+                corrections = children ^ residual
+            corrections = get_block_parities(corrections.reshape(-1, n_words), b)
+
+        return corrections[0]
+
+def sample_independent_errors(shape, p, rng):
+    # boolean array of the given shape where each entry is True with probability p
+    if p <= 0:
+        return np.zeros(shape, dtype=bool)
+    if p < 0.05:
+        # for small p, jump from one error to the next with geometric gaps instead of
+        # drawing a random number for every qubit of every shot
+        n_locations = int(np.prod(shape))
+        expected = n_locations * p
+        n_draws = int(expected + 6 * np.sqrt(expected) + 10)
+        locations = np.cumsum(rng.geometric(p, size=n_draws)) - 1
+        while locations[-1] < n_locations:
+            more = locations[-1] + np.cumsum(rng.geometric(p, size=n_draws))
+            locations = np.concatenate([locations, more])
+        errors = np.zeros(n_locations, dtype=bool)
+        errors[locations[locations < n_locations]] = True
+        return errors.reshape(shape)
+    return rng.random(shape) < p
+
+def get_logical_error_probability_for_concatenated_code(n_levels, p, error_gate='X', code='shor',
+                                                        block_size=3, n_shots=1_000_000,
+                                                        batch_size=None, seed=None):
+    # samples error patterns directly (code-capacity noise), computes syndromes, decodes,
+    # and compares the predicted observable flips with the actual ones, in batches of shots
+    levels = get_concatenated_code_levels(n_levels, code)
+    decoder = HierarchicalDecoder(levels, error_gate=error_gate, block_size=block_size)
+    rng = np.random.default_rng(seed)
+    if batch_size is None:
+        # keep each batch of unpacked error bits to roughly 64 MB, in whole bytes of shots
+        batch_size = max(8, min(n_shots, 64_000_000 // decoder.num_qubits) // 8 * 8)
+
+    logical_errors = 0
+    for start in range(0, n_shots, batch_size):
+        shots = min(batch_size, n_shots - start)
+        # errors are sampled straight into (qubit, shot) order and packed along shots
+        errors = np.packbits(sample_independent_errors((decoder.num_qubits, shots), p, rng),
+                             axis=1, bitorder='little')
+        syndromes, observable_flips = get_concatenated_code_syndromes_packed(errors, levels, error_gate, block_size)
+        predictions = decoder.decode_packed(syndromes)
+        # padding bits beyond the last shot are zero in both, so they never count as failures
+        logical_errors += int(np.unpackbits(predictions ^ observable_flips).sum())
+
+    return logical_errors / n_shots
+
+def get_logical_error_probability_concatenated(all_n_levels, ps, error_gate='X', code='shor',
+                                               block_size=3, n_shots=1_000_000, seed=None):
+    all_logical_errors = []
+    for n_levels in all_n_levels:
+        print(f"Simulating level-{n_levels} concatenated {code} code ({block_size ** n_levels} qubits)")
+        all_logical_errors.append([
+            get_logical_error_probability_for_concatenated_code(n_levels, p, error_gate=error_gate,
+                                                                code=code, block_size=block_size,
+                                                                n_shots=n_shots, seed=seed)
+            for p in ps])
+    return all_logical_errors
+
+def get_logical_error_probability_concatenated_analytical(all_n_levels, ps, error_gate='X', code='shor', block_size=3):
+    # the hierarchical decoder fails on a block exactly when its children fail in a way it
+    # cannot undo, so the logical error probability follows level by level:
+    #   detecting level: more than half of the children failed
+    #   other level:     an odd number of children failed
+    all_analytical_errors = []
+    for n_levels in all_n_levels:
+        levels = get_concatenated_code_levels(n_levels, code)
+        analytical_error = np.asarray(ps, dtype=float)
+        for is_detecting in get_detecting_levels(levels, error_gate):
+            if is_detecting:
+                analytical_error = sum(comb(block_size, i) * analytical_error**i * (1-analytical_error)**(block_size-i)
+                                       for i in range(block_size // 2 + 1, block_size + 1))
+            else:
+                analytical_error = (1 - (1 - 2*analytical_error)**block_size) / 2
+        all_analytical_errors.append(analytical_error)
+    return all_analytical_errors
@@ -1,9 +1,13 @@
 ### Version History
 ### - v0: Aug 14, 2025, [github/@ESMatekole](https:github.com/esmatekole)
 ### - v1: Sep 12, 2025, [github/@aasfaw](https:github.com/aasfaw)
+### - v2: Oct 19, 2026, collection-based rendering for large distances and animations
+### - v3: Oct 19, 2026, update_layout_colors takes the artists of the layout to recolor
 
 import cirq
 import matplotlib.pyplot as plotter
+from matplotlib.animation import FuncAnimation
+from matplotlib.collections import EllipseCollection, LineCollection, PolyCollection
 from matplotlib.patches import Circle, Rectangle
 import numpy as np
 
@@ -70,15 +74,57 @@ class PlanarSurfaceCode:
             if data_neighbors:  # Only add if there are valid neighbors
                 self.z_stabilizers[pos] = data_neighbors
 
-    def visualize_layout(self):
+    def visualize_layout(self, mode='patches'):
         """
         Visualize the surface code layout with data qubits and measure qubits.
+        mode='patches' draws one matplotlib patch per qubit and per stabilizer edge.
+        mode='collections' draws each qubit role and edge set as a single collection,
+        which stays fast at large distances (see draw_layout_collections).
         
         """
         fig, ax = plotter.subplots(1, 1, figsize=(10, 8))
         
         size = 2 * self.distance - 1
         
+        if mode == 'patches':
+            self._draw_layout_patches(ax, size)
+        elif mode == 'collections':
+            self.draw_layout_collections(ax)
+        else:
+            raise ValueError(f"Unknown mode '{mode}', expected 'patches' or 'collections'")
+        
+        ax.set_xlim(-0.5, size-0.5)
+        ax.set_ylim(-0.5, size-0.5)
+        ax.set_aspect('equal')
+        ax.grid(True, alpha=0.3)
+        
+        title = f'Distance-{self.distance} Planar Surface Code Layout'
+        ax.set_title(title, fontsize=16, fontweight='bold')
+        
+        legend_elements = [
+            Circle((0, 0), 0.1, color='lightblue', ec='black', label='Data Qubit'),
+            Rectangle((0, 0), 0.1, 0.1, color='lightgreen', ec='black', label='X Measure Qubit'),
+            Rectangle((0, 0), 0.1, 0.1, color='lightyellow', ec='black', label='Z Measure Qubit'),
+        ]
+        
+        ax.legend(handles=legend_elements, loc='upper left', bbox_to_anchor=(1, 1))
+        plotter.tight_layout()
+        plotter.show()
+        
+        # Print surface code parameters
+        print(f"Surface Code Distance: {self.distance}")
+        print(f"Total qubits: {len(self.data_qubits) + len(self.x_meas_qubits) + len(self.z_meas_qubits)}")
+        print(f"Data qubits: {len(self.data_qubits)}")
+        print(f"X measure qubits: {len(self.x_meas_qubits)}")
+        print(f"Z measure qubits: {len(self.z_meas_qubits)}")
+        print(f"X stabilizers: {len(self.x_stabilizers)}")
+        print(f"Z stabilizers: {len(self.z_stabilizers)}")
+
+    def _draw_layout_patches(self, ax, size):
+        """
+        Draw the layout with one patch, label and line per qubit and stabilizer edge.
+
+        """
         # Draw data qubits
         for pos in self.data_qubits:
             i, j = pos
@@ -117,30 +163,120 @@ class PlanarSurfaceCode:
             i, j = pos
             for di, dj in data_qubits_list:
                 ax.plot([j, dj], [size-1-i, size-1-di], 'y--', alpha=0.7, linewidth=2)
-        
+
+    def draw_layout_collections(self, ax, show_labels=None):
+        """
+        Draw the layout with one collection per qubit role and per stabilizer edge set,
+        built from coordinate arrays. Labels ('D', 'X', 'Z') are one text per qubit, so by
+        default they are only drawn up to distance 7.
+        Returns the dictionary of artists to pass to update_layout_colors, which also holds the
+        qubit orders of the collections, so every drawn layout can be recolored on its own.
+
+        """
+        size = 2 * self.distance - 1
+        if show_labels is None:
+            show_labels = self.distance <= 7
+
+        # fixed qubit orders, so colors can be addressed by index when updating
+        data_positions = list(self.data_qubits)
+        x_meas_positions = list(self.x_meas_qubits)
+        z_meas_positions = list(self.z_meas_qubits)
+
+        def to_xy(positions):
+            # (i, j) grid positions -> (x, y) plot coordinates, same as the patches drawing
+            ij = np.array(positions, dtype=float).reshape(-1, 2)
+            return np.column_stack([ij[:, 1], size - 1 - ij[:, 0]])
+
+        def edge_segments(stabilizers):
+            segments = [(pos, data_pos) for pos, data_list in stabilizers.items() for data_pos in data_list]
+            if not segments:
+                return np.zeros((0, 2, 2))
+            return np.stack([to_xy([pos for pos, _ in segments]), to_xy([data_pos for _, data_pos in segments])], axis=1)
+
+        data_xy = to_xy(data_positions)
+        x_meas_xy = to_xy(x_meas_positions)
+        z_meas_xy = to_xy(z_meas_positions)
+        square = np.array([[-0.15, -0.15], [0.15, -0.15], [0.15, 0.15], [-0.15, 0.15]])
+        diamond = np.array([[0, 0.15], [0.15, 0], [0, -0.15], [-0.15, 0]])
+
+        artists = {}
+        # stabilizer connections
+        artists['x_edges'] = LineCollection(edge_segments(self.x_stabilizers), colors='g', linestyles='--',
+                                            alpha=0.7, linewidths=2, zorder=1)
+        artists['z_edges'] = LineCollection(edge_segments(self.z_stabilizers), colors='y', linestyles='--',
+                                            alpha=0.7, linewidths=2, zorder=1)
+        # qubits
+        artists['data'] = EllipseCollection(0.6, 0.6, 0, units='xy', offsets=data_xy, offset_transform=ax.transData,
+                                            facecolors='lightblue', edgecolors='black', linewidths=2, zorder=2)
+        artists['x_meas'] = PolyCollection(x_meas_xy[:, np.newaxis, :] + square, facecolors='lightgreen',
+                                           edgecolors='black', linewidths=2, zorder=2)
+        artists['z_meas'] = PolyCollection(z_meas_xy[:, np.newaxis, :] + diamond, facecolors='lightyellow',
+                                           edgecolors='black', linewidths=2, zorder=2)
+        # error rings around data qubits, invisible until update_layout_colors gives them a color
+        artists['errors'] = EllipseCollection(0.8, 0.8, 0, units='xy', offsets=data_xy, offset_transform=ax.transData,
+                                              facecolors='none', edgecolors=np.zeros((len(data_xy), 4)),
+                                              linewidths=4, zorder=3)
+        for artist in artists.values():
+            ax.add_collection(artist)
+
+        if show_labels:
+            for xy_array, label, fontsize in [(data_xy, 'D', 10), (x_meas_xy, 'X', 10), (z_meas_xy, 'Z', 8)]:
+                for x, y in xy_array:
+                    ax.text(x, y, label, ha='center', va='center', fontweight='bold', fontsize=fontsize, zorder=4)
+
         ax.set_xlim(-0.5, size-0.5)
         ax.set_ylim(-0.5, size-0.5)
         ax.set_aspect('equal')
+
+        # position -> index in the data, x_meas and z_meas collections
+        artists['data_index'] = {pos: k for k, pos in enumerate(data_positions)}
+        artists['x_meas_index'] = {pos: k for k, pos in enumerate(x_meas_positions)}
+        artists['z_meas_index'] = {pos: k for k, pos in enumerate(z_meas_positions)}
+        return artists
+
+    def update_layout_colors(self, artists, x_errors=(), z_errors=(), y_errors=(), syndrome_x=(), syndrome_z=()):
+        """
+        Recolor the layout whose artists draw_layout_collections returned, without redrawing it: rings around
+        data qubits with X (red), Z (blue) or Y (purple) errors, and triggered measure qubits
+        in purple. Syndromes are either iterables of triggered positions or {position: 0/1}
+        dictionaries like ErrorInjection.error_syndrome_x.
+        Returns the recolored artists.
+
+        """
+        data_index = artists['data_index']
+        ring_colors = np.zeros((len(data_index), 4))
+        for positions, color in [(x_errors, 'red'), (z_errors, 'blue'), (y_errors, 'purple')]:
+            indices = [data_index[pos] for pos in positions]
+            ring_colors[indices] = plotter.matplotlib.colors.to_rgba(color, alpha=0.9)
+        artists['errors'].set_edgecolor(ring_colors)
+
+        for key, syndrome, quiet_color in [('x_meas', syndrome_x, 'lightgreen'), ('z_meas', syndrome_z, 'lightyellow')]:
+            index = artists[f'{key}_index']
+            if isinstance(syndrome, dict):
+                syndrome = [pos for pos, value in syndrome.items() if value]
+            face_colors = np.tile(plotter.matplotlib.colors.to_rgba(quiet_color), (len(index), 1))
+            face_colors[[index[pos] for pos in syndrome]] = plotter.matplotlib.colors.to_rgba('purple')
+            artists[key].set_facecolor(face_colors)
+
+        ax = artists['data'].axes
+        ax.figure.canvas.draw_idle()
+        return [artists['errors'], artists['x_meas'], artists['z_meas']]
+
+    def animate_rounds(self, rounds, interval=200):
+        """
+        Animate a sequence of syndrome rounds, eg for display with IPython.display.HTML(anim.to_jshtml()).
+        Each round is a dictionary of update_layout_colors keyword arguments (besides the artists), eg
+        {'x_errors': [(0, 0)], 'syndrome_z': [(0, 1)]}. Only the colors change between frames.
+
+        """
+        fig, ax = plotter.subplots(1, 1, figsize=(10, 8))
+        artists = self.draw_layout_collections(ax)
         ax.grid(True, alpha=0.3)
-        
-        title = f'Distance-{self.distance} Planar Surface Code Layout'
-        ax.set_title(title, fontsize=16, fontweight='bold')
-        
-        legend_elements = [
-            Circle((0, 0), 0.1, color='lightblue', ec='black', label='Data Qubit'),
-            Rectangle((0, 0), 0.1, 0.1, color='lightgreen', ec='black', label='X Measure Qubit'),
-            Rectangle((0, 0), 0.1, 0.1, color='lightyellow', ec='black', label='Z Measure Qubit'),
-        ]
-        
-        ax.legend(handles=legend_elements, loc='upper left', bbox_to_anchor=(1, 1))
-        plotter.tight_layout()
-        plotter.show()
-        
-        # Print surface code parameters
-        print(f"Surface Code Distance: {self.distance}")
-        print(f"Total qubits: {len(self.data_qubits) + len(self.x_meas_qubits) + len(self.z_meas_qubits)}")
-        print(f"Data qubits: {len(self.data_qubits)}")
-        print(f"X measure qubits: {len(self.x_meas_qubits)}")
-        print(f"Z measure qubits: {len(self.z_meas_qubits)}")
-        print(f"X stabilizers: {len(self.x_stabilizers)}")
-        print(f"Z stabilizers: {len(self.z_stabilizers)}")
\ No newline at end of file
+
+        def update(round_index):
+            ax.set_title(f'Distance-{self.distance} surface code, round {round_index}', fontsize=16, fontweight='bold')
+            return self.update_layout_colors(artists, **rounds[round_index])
+
+        animation = FuncAnimation(fig, update, frames=len(rounds), interval=interval)
+        plotter.close(fig)
+        return animation
@@ -1,8 +1,12 @@
 ### Version History
 ### - v0: Sep 12, 2025, [github/@aasfaw](https:github.com/aasfaw)
+### - v1: Oct 19, 2026, record-and-replay shot dumps
 
 import matplotlib.pyplot as plotter; plotter.rcParams['font.family'] = 'Monospace'
 from math import comb, ceil
+import hashlib
+import json
+import os
 import numpy as np
 
 def plot_logical_error_probabilities(distances, physical_errors, all_logical_errors, all_analytical_errors, ylim=[1e-10, 1.1]):
@@ -64,4 +68,123 @@ def get_logical_error_probability_analytical(distances, physical_errors):
             analytical_error += comb(distance, i) * physical_errors**i * (1-physical_errors)**(distance-i)
         all_analytical_errors.append(analytical_error)
 
-    return all_analytical_errors
\ No newline at end of file
+    return all_analytical_errors
+
+# Record-and-replay of sampled shots
+# Sampling and decoding are separate steps: we can sample detection events once, store them on
+# disk, and then replay any decoder over exactly the same shots at decode-only cost.
+#
+# File layout:
+#   - 8 bytes magic b'QECSHOT1'
+#   - 4 bytes little-endian header length, followed by that many bytes of JSON metadata
+#     (circuit hash, noise, seed, number of detectors and observables, ...)
+#   - one fixed-size row per shot: the detection events, then the observable flips, each
+#     bit-packed with bitorder 'little' like stim's bit_packed=True samples
+# The number of shots follows from the file size, so rows can be appended while sampling.
+
+SHOT_DUMP_MAGIC = b'QECSHOT1'
+
+def get_circuit_hash(circuit):
+    # sha256 of the circuit's text form, eg a stim.Circuit or a cirq.Circuit
+    return hashlib.sha256(str(circuit).encode()).hexdigest()
+
+class ShotWriter:
+    """
+    Streams shots into a shot dump file, one batch at a time.
+    Use as a context manager, or call close() when done.
+    """
+
+    def __init__(self, path, num_detectors, num_observables, circuit=None, noise=None, seed=None, **metadata):
+        self.path = path
+        self.num_detectors = num_detectors
+        self.num_observables = num_observables
+        self.detector_bytes = (num_detectors + 7) // 8
+        self.observable_bytes = (num_observables + 7) // 8
+        self.num_shots = 0
+
+        header = dict(metadata,
+                      num_detectors=num_detectors,
+                      num_observables=num_observables,
+                      circuit_hash=None if circuit is None else get_circuit_hash(circuit),
+                      noise=noise,
+                      seed=seed)
+        header = json.dumps(header).encode()
+        self.file = open(path, 'wb')
+        self.file.write(SHOT_DUMP_MAGIC + len(header).to_bytes(4, 'little') + header)
+
+    def write(self, detection_events, observable_flips, bit_packed=False):
+        # detection_events: (n_shots, num_detectors) and observable_flips: (n_shots, num_observables)
+        # booleans, or already packed (n_shots, bytes) uint8 arrays with bit_packed=True
+        if not bit_packed:
+            detection_events = np.packbits(np.asarray(detection_events, dtype=bool), axis=1, bitorder='little')
+            observable_flips = np.packbits(np.asarray(observable_flips, dtype=bool), axis=1, bitorder='little')
+        detection_events = np.asarray(detection_events, dtype=np.uint8).reshape(len(detection_events), self.detector_bytes)
+        observable_flips = np.asarray(observable_flips, dtype=np.uint8).reshape(len(detection_events), self.observable_bytes)
+        self.file.write(np.concatenate([detection_events, observable_flips], axis=1).tobytes())
+        self.num_shots += len(detection_events)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def record_shots(path, circuit, n_shots, noise=None, seed=None, batch_size=1_000_000, **metadata):
+    # samples a stim circuit's detection events and observable flips straight into a shot dump
+    sampler = circuit.compile_detector_sampler(seed=seed)
+    with ShotWriter(path, circuit.num_detectors, circuit.num_observables,
+                    circuit=circuit, noise=noise, seed=seed, **metadata) as writer:
+        for start in range(0, n_shots, batch_size):
+            detection_events, observable_flips = sampler.sample(min(batch_size, n_shots - start),
+                                                                separate_observables=True, bit_packed=True)
+            writer.write(detection_events, observable_flips, bit_packed=True)
+    return path
+
+def read_shot_metadata(path):
+    # returns the JSON metadata of a shot dump, plus where its rows start and how many there are
+    with open(path, 'rb') as file:
+        if file.read(len(SHOT_DUMP_MAGIC)) != SHOT_DUMP_MAGIC:
+            raise ValueError(f"{path} is not a shot dump file")
+        header_length = int.from_bytes(file.read(4), 'little')
+        metadata = json.loads(file.read(header_length))
+    metadata['data_offset'] = len(SHOT_DUMP_MAGIC) + 4 + header_length
+    metadata['row_bytes'] = (metadata['num_detectors'] + 7) // 8 + (metadata['num_observables'] + 7) // 8
+    # a row that was only partly written (eg an interrupted recording) is ignored
+    data_bytes = os.path.getsize(path) - metadata['data_offset']
+    metadata['num_shots'] = data_bytes // metadata['row_bytes'] if metadata['row_bytes'] else 0
+    return metadata
+
+def iterate_shots(path, chunk_size=1_000_000, bit_packed=False):
+    # yields (detection_events, observable_flips) for chunk_size shots at a time, read through
+    # np.memmap so only the current chunk is loaded into memory
+    metadata = read_shot_metadata(path)
+    if metadata['num_shots'] == 0:
+        return
+    rows = np.memmap(path, dtype=np.uint8, mode='r', offset=metadata['data_offset'],
+                     shape=(metadata['num_shots'], metadata['row_bytes']))
+    detector_bytes = (metadata['num_detectors'] + 7) // 8
+    for start in range(0, metadata['num_shots'], chunk_size):
+        chunk = np.asarray(rows[start:start + chunk_size])
+        detection_events, observable_flips = chunk[:, :detector_bytes], chunk[:, detector_bytes:]
+        if not bit_packed:
+            detection_events = np.unpackbits(detection_events, axis=1, count=metadata['num_detectors'],
+                                             bitorder='little').astype(bool)
+            observable_flips = np.unpackbits(observable_flips, axis=1, count=metadata['num_observables'],
+                                             bitorder='little').astype(bool)
+        yield detection_events, observable_flips
+
+def replay_logical_error_probability(path, decode_batch, chunk_size=1_000_000):
+    # decode_batch maps (n_shots, num_detectors) detection events to (n_shots, num_observables)
+    # predicted observable flips, eg Matching.from_detector_error_model(dem).decode_batch
+    logical_errors = 0
+    n_shots = 0
+    for detection_events, observable_flips in iterate_shots(path, chunk_size=chunk_size):
+        predicted_observables = np.asarray(decode_batch(detection_events)).reshape(observable_flips.shape)
+        logical_errors += np.sum(np.any(predicted_observables != observable_flips, axis=1))
+        n_shots += len(detection_events)
+    if n_shots == 0:
+        raise ValueError(f"{path} contains no shots")
+    return logical_errors / n_shots
@@ -0,0 +1,162 @@
+### Version History
+### - v0: Oct 19, 2026
+### - v1: Oct 19, 2026, opt-in cache, extra cache keys, per-call shot caps
+### - v2: Oct 19, 2026, cached results keep their type, unsupported key values raise
+
+from math import ceil
+import functools
+import hashlib
+import inspect
+import json
+import os
+import numpy as np
+
+# Shot budgets let the same notebook run as written (hours for the largest sweeps), or scaled down
+# consistently for the docs build and for quick smoke checks. The profile is picked with the
+# QEC_BUDGET_PROFILE environment variable, eg
+#
+#     QEC_BUDGET_PROFILE=docs jupyter nbconvert --execute ...
+#
+# Every profile scales shot counts by `shot_fraction`, clipped to [min_shots, max_shots] (and never
+# above the original count), and keeps a `grid_fraction` share of the points of parameter grids,
+# always including both endpoints.
+#
+# Results of expensive sweep points can also be cached on disk, keyed by their parameters, so that
+# re-running a notebook only simulates the points that are not cached yet. The cache is used under
+# the scaled-down profiles, in the .sweep_cache directory next to the notebook, or under any
+# profile when QEC_SWEEP_CACHE_DIR names a directory. With the default 'full' profile and no
+# QEC_SWEEP_CACHE_DIR, every run simulates every point again. Setting QEC_SWEEP_CACHE_DIR to an
+# empty string turns the cache off under all profiles.
+
+BUDGET_PROFILES = {
+    'smoke': {'shot_fraction': 1e-3, 'min_shots': 1_000, 'max_shots': 10_000,
+              'grid_fraction': 0.25, 'min_grid_points': 2},
+    'docs': {'shot_fraction': 1e-2, 'min_shots': 10_000, 'max_shots': 1_000_000,
+             'grid_fraction': 0.5, 'min_grid_points': 3},
+    'full': {'shot_fraction': 1, 'min_shots': 0, 'max_shots': None,
+             'grid_fraction': 1, 'min_grid_points': 1},
+}
+DEFAULT_BUDGET_PROFILE = 'full'
+
+def get_budget_profile_name(profile=None):
+    name = profile if profile is not None else os.environ.get('QEC_BUDGET_PROFILE', DEFAULT_BUDGET_PROFILE)
+    if name not in BUDGET_PROFILES:
+        raise ValueError(f"Unknown budget profile '{name}', expected one of {list(BUDGET_PROFILES)}")
+    return name
+
+def get_budget_profile(profile=None):
+    return BUDGET_PROFILES[get_budget_profile_name(profile)]
+
+def scale_shots(n_shots, profile=None, max_shots=None):
+    # the number of shots to run instead of n_shots under the given (or the active) profile
+    # max_shots further caps the scaled-down profiles for slow simulations, eg one cirq.Simulator
+    # run per shot; the 'full' profile always runs n_shots
+    settings = get_budget_profile(profile)
+    scaled = max(ceil(n_shots * settings['shot_fraction']), settings['min_shots'])
+    if settings['max_shots'] is not None:
+        scaled = min(scaled, settings['max_shots'])
+    if max_shots is not None and settings['shot_fraction'] < 1:
+        scaled = min(scaled, max_shots)
+    return int(min(scaled, n_shots))
+
+def scale_grid(values, profile=None):
+    # an evenly spread subset of the grid points in values, endpoints included, with the same type
+    # as values (list or array), eg scale_grid(np.logspace(-4, -1, 20)) or scale_grid([3, 5, 7, 9])
+    settings = get_budget_profile(profile)
+    n_values = len(values)
+    n_kept = min(n_values, max(ceil(n_values * settings['grid_fraction']), settings['min_grid_points']))
+    if n_kept == n_values:
+        return values
+    indices = np.unique(np.round(np.linspace(0, n_values - 1, n_kept)).astype(int))
+    if isinstance(values, np.ndarray):
+        return values[indices]
+    return [values[index] for index in indices]
+
+def get_sweep_cache_directory():
+    # None when results should not be cached
+    if 'QEC_SWEEP_CACHE_DIR' in os.environ:
+        return os.environ['QEC_SWEEP_CACHE_DIR'] or None
+    if get_budget_profile_name() == 'full':
+        return None
+    return '.sweep_cache'
+
+def _to_json(value):
+    # numpy scalars and arrays; other objects have no stable JSON form (a default repr holds a memory
+    # address, so the key would change every run and never hit), pass them as a cache_key instead
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Cannot use a {type(value).__name__} value in a sweep cache key, pass a cache_key string instead")
+
+def _get_source(function):
+    try:
+        return inspect.getsource(function)
+    except (OSError, TypeError):
+        return function.__code__.co_code.hex()
+
+def _get_function_hash(function, depends_on=()):
+    # changing the code of a function, or of the functions it depends on, invalidates its cached results
+    # depends_on can also hold values, eg a circuit hash, that are hashed by their JSON representation
+    parts = [_get_source(function)]
+    for dependency in depends_on:
+        parts.append(_get_source(dependency) if callable(dependency) else json.dumps(dependency, default=_to_json))
+    return hashlib.sha256('\n'.join(parts).encode()).hexdigest()[:16]
+
+def cache_results(function=None, *, shots_parameter='n_shots', ignore=(), depends_on=()):
+    """
+    Decorator that caches the results of a sweep point function on disk, keyed by its arguments.
+    The `shots_parameter` argument is not part of the key: a cached result is reused whenever it was
+    computed with at least as many shots as requested, so results from a 'full' run also serve
+    the 'docs' and 'smoke' profiles. Arguments listed in `ignore` (eg verbose) are not part of the key.
+    The key also covers the source of the function and of the helpers listed in `depends_on`
+    (eg the circuit builder it calls), and any `cache_key` keyword passed to a call, eg
+    cache_key=get_circuit_hash(circuit), which is not passed on to the function.
+    Results must be JSON serializable, like the floats returned by the logical error probability functions,
+    and while the cache is on they are returned as read back from JSON, on a hit or a miss alike
+    (eg np.float64 becomes float).
+    """
+    if function is None:
+        return functools.partial(cache_results, shots_parameter=shots_parameter, ignore=ignore,
+                                 depends_on=depends_on)
+
+    signature = inspect.signature(function)
+    function_hash = _get_function_hash(function, depends_on)
+
+    @functools.wraps(function)
+    def cached_function(*args, cache_key=None, **kwargs):
+        cache_directory = get_sweep_cache_directory()
+        if not cache_directory:
+            return function(*args, **kwargs)
+
+        arguments = signature.bind(*args, **kwargs)
+        arguments.apply_defaults()
+        parameters = {name: value for name, value in arguments.arguments.items()
+                      if name != shots_parameter and name not in ignore}
+        n_shots = arguments.arguments.get(shots_parameter)
+        if cache_key is not None:
+            parameters['cache_key'] = cache_key
+        key = json.dumps(parameters, sort_keys=True, default=_to_json)
+
+        path = os.path.join(cache_directory, f'{function.__name__}-{function_hash}.json')
+        cache = {}
+        if os.path.exists(path):
+            with open(path) as file:
+                cache = json.load(file)
+        entry = cache.get(key)
+        if entry is not None and (n_shots is None or entry['n_shots'] >= n_shots):
+            return entry['result']
+
+        try:
+            result = json.loads(json.dumps(function(*args, **kwargs)))
+        except TypeError as error:
+            raise TypeError(f"{function.__name__} must return JSON serializable results to be cached") from error
+        cache[key] = {'n_shots': n_shots, 'result': result}
+        # write to a temporary file first, so an interrupted run never leaves a broken cache behind
+        os.makedirs(cache_directory, exist_ok=True)
+        with open(path + '.tmp', 'w') as file:
+            json.dump(cache, file, indent=1)
+        os.replace(path + '.tmp', path)
+        return result
+
+    return cached_function